@@ -2,10 +2,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import duckdb
-import matplotlib.pyplot as plt
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import os
 
@@ -34,33 +31,79 @@ def load_data():
     
     con = duckdb.connect(str(db_path))
     
-    # Get the indices data
-    indices_df = pd.DataFrame(con.execute("""
-        SELECT * FROM daily_index
-        ORDER BY date DESC
-        LIMIT 180
-    """).fetchall())
-    
-    if not indices_df.empty:
-        indices_df.columns = ['date', 'capability', 'attention', 'market', 'regulatory']
-        indices_df['date'] = pd.to_datetime(indices_df['date'])
-        indices_df = indices_df.sort_values('date')
+    # Get the last 180 days of indices, oldest first
+    indices_df = con.execute("""
+        SELECT date, capability, attention, market, regulatory FROM (
+            SELECT * FROM daily_index
+            ORDER BY date DESC
+            LIMIT 180
+        )
+        ORDER BY date ASC
+    """).df()
     
     # Get the alerts data
-    alerts_df = pd.DataFrame(con.execute("""
-        SELECT * FROM alerts
-        ORDER BY date DESC
-        LIMIT 180
-    """).fetchall())
-    
-    if not alerts_df.empty:
-        alerts_df.columns = ['date', 'capability_prob', 'attention_prob', 'market_prob', 'regulatory_prob', 'alert']
-        alerts_df['date'] = pd.to_datetime(alerts_df['date'])
-        alerts_df = alerts_df.sort_values('date')
+    alerts_df = con.execute("""
+        SELECT date, capability_prob, attention_prob, market_prob, regulatory_prob, alert FROM (
+            SELECT * FROM alerts
+            ORDER BY date DESC
+            LIMIT 180
+        )
+        ORDER BY date ASC
+    """).df()
     
     con.close()
     return indices_df, alerts_df
 
+# Change point probability columns and their heatmap row labels
+PROB_COLUMNS = ['capability_prob', 'attention_prob', 'market_prob', 'regulatory_prob']
+PROB_LABELS = ['Capability', 'Attention', 'Market', 'Regulatory']
+
+@st.cache_data
+def build_line_figure(col: str, title: str, x_bytes: bytes, y_bytes: bytes):
+    """Build the WebGL line chart for a single index from raw date/value buffers"""
+    x = np.frombuffer(x_bytes, dtype='datetime64[ns]')
+    y = np.frombuffer(y_bytes, dtype=np.float64)
+    fig = go.Figure(go.Scattergl(x=x, y=y, mode='lines', name=col))
+    fig.update_layout(height=300, title=title, xaxis_title='Date', yaxis_title='Z-Score')
+    return fig
+
+@st.cache_data
+def build_heatmap_figure(x_bytes: bytes, z_bytes: bytes):
+    """Build the change point probability heatmap from raw date/probability buffers"""
+    x = np.frombuffer(x_bytes, dtype='datetime64[ns]')
+    z = np.frombuffer(z_bytes, dtype=np.float32).reshape(len(PROB_LABELS), -1)
+    fig = go.Figure(go.Heatmap(
+        z=z,
+        x=x,
+        y=PROB_LABELS,
+        zmin=0,
+        zmax=1,
+        colorscale='Viridis',
+        colorbar=dict(title="Probability")
+    ))
+    fig.update_layout(height=400, xaxis_title="Date", yaxis_title="Index")
+    return fig
+
+@st.fragment
+def render_index_panel(df: pd.DataFrame, col: str, subheader: str, title: str):
+    """Render one index chart; reruns independently of the rest of the page"""
+    st.subheader(subheader)
+    # Raw buffers make the cache key cheap to hash
+    x_bytes = df['date'].to_numpy(dtype='datetime64[ns]').tobytes()
+    y_bytes = df[col].to_numpy(dtype=np.float64).tobytes()
+    st.plotly_chart(build_line_figure(col, title, x_bytes, y_bytes), use_container_width=True,
+                    config={"staticPlot": False})
+
+@st.fragment
+def render_heatmap(alerts_df: pd.DataFrame):
+    """Render the change point probability heatmap"""
+    st.subheader("Change Point Probability Heatmap")
+    # One row per index, already in the shape go.Heatmap expects
+    x_bytes = alerts_df['date'].to_numpy(dtype='datetime64[ns]').tobytes()
+    z_bytes = alerts_df[PROB_COLUMNS].to_numpy(dtype=np.float32).T.tobytes()
+    st.plotly_chart(build_heatmap_figure(x_bytes, z_bytes), use_container_width=True,
+                    config={"responsive": True})
+
 # Load the data
 indices_df, alerts_df = load_data()
 
@@ -77,7 +120,7 @@ if indices_df is not None and not indices_df.empty:
         recent_alert = any(recent_alerts['alert'])
         
         # Check if any probability is above 0.3 (warning level)
-        last_probs = alerts_df.iloc[-1][['capability_prob', 'attention_prob', 'market_prob', 'regulatory_prob']]
+        last_probs = alerts_df.iloc[-1][PROB_COLUMNS]
         high_prob = any(last_probs > 0.3)
     
     # Determine status
@@ -114,58 +157,23 @@ if indices_df is not None and not indices_df.empty:
     
     # Capability Index
     with col1:
-        st.subheader("Capability Index")
-        fig = px.line(indices_df, x='date', y='capability', 
-                    title='AI Capability Progression',
-                    labels={'capability': 'Z-Score', 'date': 'Date'})
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        render_index_panel(indices_df, 'capability', "Capability Index", 'AI Capability Progression')
     
     # Attention Index
     with col2:
-        st.subheader("Attention Index")
-        fig = px.line(indices_df, x='date', y='attention', 
-                    title='Public Attention to AI',
-                    labels={'attention': 'Z-Score', 'date': 'Date'})
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        render_index_panel(indices_df, 'attention', "Attention Index", 'Public Attention to AI')
     
     # Market Index
     with col3:
-        st.subheader("Market Index")
-        fig = px.line(indices_df, x='date', y='market', 
-                    title='AI Markets',
-                    labels={'market': 'Z-Score', 'date': 'Date'})
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        render_index_panel(indices_df, 'market', "Market Index", 'AI Markets')
     
     # Regulatory Index
     with col4:
-        st.subheader("Regulatory Index")
-        fig = px.line(indices_df, x='date', y='regulatory', 
-                    title='Regulatory Activity',
-                    labels={'regulatory': 'Z-Score', 'date': 'Date'})
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        render_index_panel(indices_df, 'regulatory', "Regulatory Index", 'Regulatory Activity')
     
     # Change point probability heatmap
     if alerts_df is not None and not alerts_df.empty:
-        st.subheader("Change Point Probability Heatmap")
-        
-        # Prepare data for heatmap
-        heatmap_data = alerts_df[['date', 'capability_prob', 'attention_prob', 'market_prob', 'regulatory_prob']]
-        heatmap_data = heatmap_data.set_index('date')
-        
-        # Create the heatmap
-        fig = px.imshow(
-            heatmap_data.T,
-            labels=dict(x="Date", y="Index", color="Probability"),
-            x=heatmap_data.index,
-            y=['Capability', 'Attention', 'Market', 'Regulatory'],
-            color_continuous_scale='Viridis'
-        )
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        render_heatmap(alerts_df)
         
         # Display the latest probabilities
         st.subheader("Latest Change Point Probabilities")
@@ -175,22 +183,18 @@ if indices_df is not None and not indices_df.empty:
         m1, m2, m3, m4 = st.columns(4)
         
         with m1:
-            color = "red" if latest['capability_prob'] >= 0.5 else "orange" if latest['capability_prob'] >= 0.3 else "green"
             st.metric("Capability", f"{latest['capability_prob']:.2f}", delta=None,
                     delta_color="normal")
         
         with m2:
-            color = "red" if latest['attention_prob'] >= 0.5 else "orange" if latest['attention_prob'] >= 0.3 else "green"
             st.metric("Attention", f"{latest['attention_prob']:.2f}", delta=None,
                     delta_color="normal")
         
         with m3:
-            color = "red" if latest['market_prob'] >= 0.5 else "orange" if latest['market_prob'] >= 0.3 else "green"
             st.metric("Market", f"{latest['market_prob']:.2f}", delta=None,
                     delta_color="normal")
         
         with m4:
-            color = "red" if latest['regulatory_prob'] >= 0.5 else "orange" if latest['regulatory_prob'] >= 0.3 else "green"
             st.metric("Regulatory", f"{latest['regulatory_prob']:.2f}", delta=None,
                     delta_color="normal")
     
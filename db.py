@@ -0,0 +1,81 @@
+import functools
+import duckdb
+
+from settings import DATA_DIR
+
+# Column definitions for each table; every table is keyed on date
+TABLES = {
+    "daily_index": """
+        date DATE PRIMARY KEY,
+        capability FLOAT,
+        attention FLOAT,
+        market FLOAT,
+        regulatory FLOAT
+    """,
+    "alerts": """
+        date DATE PRIMARY KEY,
+        capability_prob FLOAT,
+        attention_prob FLOAT,
+        market_prob FLOAT,
+        regulatory_prob FLOAT,
+        alert BOOLEAN
+    """,
+}
+
+def _ensure_primary_key(con: duckdb.DuckDBPyConnection, table: str, columns: str):
+    """
+    Rebuild a table created before date was its primary key, keeping the
+    latest row for each date
+    """
+    has_pk = con.execute("""
+        SELECT COUNT(*) FROM duckdb_constraints()
+        WHERE table_name = ? AND constraint_type = 'PRIMARY KEY'
+    """, [table]).fetchone()[0]
+    if has_pk:
+        return
+
+    con.begin()
+    try:
+        con.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+        con.execute(f"CREATE TABLE {table} ({columns})")
+        con.execute(f"""
+            INSERT INTO {table}
+            SELECT * EXCLUDE (rn) FROM (
+                SELECT *, row_number() OVER (PARTITION BY date ORDER BY rowid DESC) AS rn
+                FROM {table}_old
+            )
+            WHERE rn = 1
+        """)
+        con.execute(f"DROP TABLE {table}_old")
+        con.commit()
+    except Exception:
+        # Undo the half-finished rebuild so the original table is left intact
+        con.rollback()
+        raise
+
+@functools.lru_cache(maxsize=1)
+def get_connection() -> duckdb.DuckDBPyConnection:
+    """
+    Open the shared DuckDB connection, creating the tables on first use
+    """
+    db_path = DATA_DIR / "agidash.duckdb"
+    con = duckdb.connect(str(db_path))
+
+    for table, columns in TABLES.items():
+        con.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        _ensure_primary_key(con, table, columns)
+
+    return con
+
+def get_cursor() -> duckdb.DuckDBPyConnection:
+    """
+    Return a cursor on the shared connection (one per op, safe across threads)
+    """
+    return get_connection().cursor()
+
+def checkpoint():
+    """
+    Compact the WAL into the database file; call once per run, after the
+    op's cursor is closed (an open cursor that upserted blocks the checkpoint)
+    """
+    get_connection().execute("CHECKPOINT")
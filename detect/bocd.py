@@ -1,29 +1,142 @@
 import os
+import math
 import pandas as pd
 import numpy as np
-import duckdb
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dagster import job, schedule, op, ScheduleDefinition
-from bayesian_changepoint_detection.online_changepoint_detection import BOCD
+from numba import njit
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import logging
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
-from settings import DATA_DIR, SLACK_WEBHOOK
+from settings import SLACK_WEBHOOK
+from db import get_cursor, checkpoint
+
+# Normal-Gamma prior on the (z-scored) index values
+MU0 = 0.0
+KAPPA0 = 1.0
+ALPHA0 = 1.0
+BETA0 = 1.0
+
+# Run-length truncation: longest run tracked and smallest probability kept
+R_MAX = 300
+PRUNE_THRESHOLD = 1e-4
+
+# Indices monitored by the daily detection job, and their expected run length
+INDICES = ['capability', 'attention', 'market', 'regulatory']
+HAZARD = 250
+
+@njit(cache=True, nogil=True)
+def _bocpd_step(xt, probs, mu, kappa, alpha, beta, hazard, r_max=R_MAX):
+    """
+    Advance the run-length posterior by one observation (Adams & MacKay, 2007)
+    
+    Index 0 of the returned posterior is the probability that a changepoint
+    occurred at this timestep, i.e. that xt starts a new segment.
+    """
+    n = probs.shape[0]
+    
+    # Sufficient statistics for "new segment" (prior) followed by each existing run
+    mu_all = np.empty(n + 1)
+    kappa_all = np.empty(n + 1)
+    alpha_all = np.empty(n + 1)
+    beta_all = np.empty(n + 1)
+    mu_all[0] = MU0
+    kappa_all[0] = KAPPA0
+    alpha_all[0] = ALPHA0
+    beta_all[0] = BETA0
+    mu_all[1:] = mu
+    kappa_all[1:] = kappa
+    alpha_all[1:] = alpha
+    beta_all[1:] = beta
+    
+    # Student-t predictive log-density of xt under each run
+    df = 2.0 * alpha_all
+    scale2 = beta_all * (kappa_all + 1.0) / (alpha_all * kappa_all)
+    log_pred = np.empty(n + 1)
+    for i in range(n + 1):
+        log_pred[i] = (
+            math.lgamma(0.5 * (df[i] + 1.0))
+            - math.lgamma(0.5 * df[i])
+            - 0.5 * math.log(df[i] * math.pi * scale2[i])
+            - 0.5 * (df[i] + 1.0) * math.log1p((xt - mu_all[i]) ** 2 / (df[i] * scale2[i]))
+        )
+    
+    # Changepoint mass P*H and growth mass P*(1-H), in log space
+    log_joint = np.empty(n + 1)
+    log_joint[0] = math.log(hazard) + log_pred[0]
+    log_joint[1:] = math.log(1.0 - hazard) + np.log(probs) + log_pred[1:]
+    
+    new_probs = np.exp(log_joint - log_joint.max())
+    new_probs /= new_probs.sum()
+    
+    # Update the sufficient statistics with xt
+    new_mu = (kappa_all * mu_all + xt) / (kappa_all + 1.0)
+    new_beta = beta_all + kappa_all * (xt - mu_all) ** 2 / (2.0 * (kappa_all + 1.0))
+    new_kappa = kappa_all + 1.0
+    new_alpha = alpha_all + 0.5
+    
+    # Cap the run length at r_max, folding the tail mass into the last run
+    if n + 1 > r_max:
+        new_probs[r_max - 1] += new_probs[r_max:].sum()
+        new_probs = new_probs[:r_max]
+        new_mu = new_mu[:r_max]
+        new_kappa = new_kappa[:r_max]
+        new_alpha = new_alpha[:r_max]
+        new_beta = new_beta[:r_max]
+    
+    # Prune negligible run lengths and renormalize
+    new_probs[new_probs < PRUNE_THRESHOLD] = 0.0
+    new_probs /= new_probs.sum()
+    
+    return new_probs, new_mu, new_kappa, new_alpha, new_beta
+
+@njit(cache=True, nogil=True)
+def _bocpd_run(x, hazard, r_max=R_MAX):
+    """
+    Run BOCPD over a whole series and return the changepoint probability
+    at the final timestep
+    
+    Args:
+        x: 1-D float64 array of observations
+        hazard: Per-step changepoint probability (1 / expected run length)
+        r_max: Maximum run length kept in the posterior
+    """
+    probs = np.ones(1)
+    mu = np.full(1, MU0)
+    kappa = np.full(1, KAPPA0)
+    alpha = np.full(1, ALPHA0)
+    beta = np.full(1, BETA0)
+    
+    for t in range(x.shape[0]):
+        probs, mu, kappa, alpha, beta = _bocpd_step(x[t], probs, mu, kappa, alpha, beta, hazard, r_max)
+    
+    return probs[0]
 
 class BOCPDDetector:
-    def __init__(self, hazard=250):
+    def __init__(self, hazard=HAZARD, r_max=R_MAX, max_t=180, debug=False):
         """
         Initialize the Bayesian Online Changepoint Detection model
         
         Args:
             hazard: Hazard rate (expected run length between changepoints)
+            r_max: Maximum run length kept in the posterior
+            max_t: Expected number of timesteps (initial history capacity)
+            debug: Record every posterior in the history buffer (for plot_posterior)
         """
         self.hazard = hazard
-        self.detector = BOCD(hazard=hazard)
-        self.posterior_history = []
+        self.r_max = r_max
+        self.debug = debug
+        self.posterior = np.ones(1)
+        self._hist = np.zeros((max_t, r_max), dtype=np.float32) if debug else None
+        self._t = 0
+        self._mu = np.full(1, MU0)
+        self._kappa = np.full(1, KAPPA0)
+        self._alpha = np.full(1, ALPHA0)
+        self._beta = np.full(1, BETA0)
         
     def update(self, x: np.ndarray) -> float:
         """
@@ -39,18 +152,28 @@ class BOCPDDetector:
             x = np.array([x])
             
         # Update the model with the new data
-        for val in x:
-            self.detector.update(val)
-            
-        # Get the current posterior distribution
-        posterior = self.detector.get_posterior()
-        self.posterior_history.append(posterior)
+        for val in np.asarray(x, dtype=np.float64):
+            self.posterior, self._mu, self._kappa, self._alpha, self._beta = _bocpd_step(
+                val, self.posterior, self._mu, self._kappa, self._alpha, self._beta, 1.0 / self.hazard, self.r_max
+            )
+            if self.debug:
+                self._record(self.posterior)
         
         # Calculate the probability of a changepoint at the current timestep
         # (probability of run length being 0)
-        p_cp = posterior[0]
+        p_cp = self.posterior[0]
         
         return p_cp
+    
+    def _record(self, posterior: np.ndarray):
+        """
+        Write a posterior into the next row of the history buffer
+        """
+        # Double the capacity if the series outgrows max_t
+        if self._t == self._hist.shape[0]:
+            self._hist = np.concatenate([self._hist, np.zeros_like(self._hist)])
+        self._hist[self._t, :len(posterior)] = posterior
+        self._t += 1
 
 
 @op
@@ -58,20 +181,18 @@ def load_daily_indices():
     """
     Load the daily indices from DuckDB
     """
-    db_path = DATA_DIR / "agidash.duckdb"
-    con = duckdb.connect(str(db_path))
+    con = get_cursor()
     
-    # Get the last 180 days of data
-    df = pd.DataFrame(con.execute("""
-        SELECT * FROM daily_index
+    # Get the last 180 days of data, oldest first
+    df = con.execute("""
+        SELECT date, capability, attention, market, regulatory FROM (
+            SELECT * FROM daily_index
+            ORDER BY date DESC
+            LIMIT 180
+        )
         ORDER BY date ASC
-        LIMIT 180
-    """).fetchall())
-    
-    if not df.empty:
-        df.columns = ['date', 'capability', 'attention', 'market', 'regulatory']
+    """).df()
     
-    con.close()
     return df
 
 @op
@@ -85,59 +206,40 @@ def detect_changepoints(df: pd.DataFrame):
     # Convert date to datetime
     df['date'] = pd.to_datetime(df['date'])
     
-    # Create a detector for each index
-    detectors = {
-        'capability': BOCPDDetector(),
-        'attention': BOCPDDetector(),
-        'market': BOCPDDetector(),
-        'regulatory': BOCPDDetector()
-    }
-    
     # Initialize results dictionary
     results = {
         'date': df['date'].iloc[-1].strftime('%Y-%m-%d'),
         'changepoint_probs': {}
     }
     
-    # Process each index
-    for index_name, detector in detectors.items():
-        if index_name in df.columns:
-            # Get the data for this index
-            x = df[index_name].values
-            
-            # Remove NaN values
-            x = x[~np.isnan(x)]
-            
-            if len(x) > 0:
-                # Update the detector with all data points
-                for val in x:
-                    p_cp = detector.update(val)
-                
-                # Store the final probability
-                results['changepoint_probs'][index_name] = float(p_cp)
+    # Get the data for each index, removing NaN values
+    series = {
+        index_name: df[index_name].dropna().to_numpy(np.float64)
+        for index_name in INDICES
+        if index_name in df.columns
+    }
+    
+    # The compiled recursion releases the GIL, so the indices run in parallel
+    with ThreadPoolExecutor(max_workers=len(INDICES)) as executor:
+        futures = {
+            index_name: executor.submit(_bocpd_run, x, 1.0 / HAZARD)
+            for index_name, x in series.items()
+            if len(x) > 0
+        }
+        
+        # Store the final probability
+        for index_name, future in futures.items():
+            results['changepoint_probs'][index_name] = float(future.result())
     
     # Check if any probability exceeds the threshold
     results['alert'] = any(p >= 0.5 for p in results['changepoint_probs'].values())
     
-    # Connect to DuckDB and store the results
-    db_path = DATA_DIR / "agidash.duckdb"
-    con = duckdb.connect(str(db_path))
-    
-    # Create table if it doesn't exist
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS alerts (
-            date DATE,
-            capability_prob FLOAT,
-            attention_prob FLOAT,
-            market_prob FLOAT,
-            regulatory_prob FLOAT,
-            alert BOOLEAN
-        )
-    """)
+    # Store the results in DuckDB
+    con = get_cursor()
     
     # Insert the new alert
     con.execute("""
-        INSERT INTO alerts
+        INSERT OR REPLACE INTO alerts
         VALUES (?, ?, ?, ?, ?, ?)
     """, [
         results['date'],
@@ -150,6 +252,9 @@ def detect_changepoints(df: pd.DataFrame):
     
     con.close()
     
+    # Compact the WAL into the database file once per run
+    checkpoint()
+    
     return results
 
 @op
@@ -211,11 +316,11 @@ def plot_posterior(detector: BOCPDDetector, dates, values, title=''):
     """
     Plot the posterior probabilities of run lengths
     """
-    if not detector.posterior_history:
+    if not detector._t:
         return
     
-    # Stack the posteriors into a 2D array
-    posteriors = np.vstack(detector.posterior_history)
+    # Recorded posteriors, one row per timestep
+    posteriors = detector._hist[:detector._t]
     
     # Create a figure and axis
     fig, ax = plt.subplots(figsize=(12, 6))
@@ -1,31 +1,51 @@
 import os
+import glob
+import logging
+import duckdb
 import pandas as pd
 import numpy as np
-import duckdb
 from datetime import datetime, timedelta
-from dagster import asset, DependsOn
+from dagster import asset
 
 from settings import DATA_DIR
+from db import get_cursor, checkpoint
 from ingest.google_trends import fetch_trends
 from ingest.polymarket import polymarket_asset
 from ingest.capability_scraper import capability_asset
 from ingest.legislation import legislation_asset
 from ingest.news_pixels import news_pixels_asset
 
-def normalize_data(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+# Daily score per source: staging file pattern (relative to staging/) and a
+# query over today's Parquet
+STAGING_SCORES = {
+    # 1. Capability: average of the per-metric means across models
+    'capability': ('capabilities/{today}.parquet', """
+        SELECT list_avg([*COLUMNS(*)]) FROM (
+            SELECT AVG(TRY_CAST(COLUMNS('MMMU|MMLU-pro|GSM-Hard') AS DOUBLE)) FROM read_parquet(?)
+        )
+    """),
+    # 2. Attention: Google Trends interest across keywords, and news pixels
+    'trends': ('google_trends/{today}.parquet', """
+        SELECT list_avg([*COLUMNS(*)]) FROM (
+            SELECT AVG(COLUMNS(* EXCLUDE (date))) FROM read_parquet(?)
+        )
+    """),
+    'news': ('news_pixels/{today}.parquet', "SELECT AVG(ai_pixel_percentage) FROM read_parquet(?)"),
+    # 3. Market: Polymarket prices, a Hive-partitioned dataset
+    'market': ('polymarket/date={today}/*.parquet', "SELECT AVG(price) FROM read_parquet(?)"),
+    # 4. Regulatory: AI bill count from legislation
+    'regulatory': ('legislation/{today}.parquet', "SELECT AVG(ai_bill_count) FROM read_parquet(?)"),
+}
+
+def _score_source(con: duckdb.DuckDBPyConnection, name: str, query: str, path: str):
     """
-    Normalize data to z-scores
+    Score one staging Parquet on its own, returning None if it can't be scored
     """
-    result = df.copy()
-    for column in columns:
-        if column in result.columns:
-            mean = result[column].mean()
-            std = result[column].std()
-            if std > 0:
-                result[column] = (result[column] - mean) / std
-            else:
-                result[column] = 0  # Handle case where std is 0
-    return result
+    try:
+        return con.execute(query, [path]).fetchone()[0]
+    except duckdb.Error as e:
+        logging.warning(f"Could not score {name} from {path}: {e}")
+        return None
 
 @asset(deps=[
     fetch_trends,
@@ -41,65 +61,37 @@ def daily_index():
     """
     today = datetime.now().strftime("%Y-%m-%d")
     
-    # Connect to DuckDB
-    db_path = DATA_DIR / "agidash.duckdb"
-    con = duckdb.connect(str(db_path))
-    
-    # Create tables if they don't exist
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS daily_index (
-            date DATE,
-            capability FLOAT,
-            attention FLOAT,
-            market FLOAT,
-            regulatory FLOAT
-        )
-    """)
-    
-    # 1. Capability Index (from capability_scraper)
-    capability_path = DATA_DIR / "staging" / "capabilities" / f"{today}.parquet"
-    if capability_path.exists():
-        capabilities_df = pd.read_parquet(capability_path)
-        # Average the scores across models and metrics
-        capability_score = capabilities_df.filter(regex='MMMU|MMLU-pro|GSM-Hard').mean().mean()
-    else:
-        capability_score = 0
-    
-    # 2. Attention Index (from google_trends and news_pixels)
-    # Google Trends
-    trends_path = DATA_DIR / "staging" / "google_trends" / f"{today}.parquet"
-    if trends_path.exists():
-        trends_df = pd.read_parquet(trends_path)
-        trends_score = trends_df.mean().mean()
-    else:
-        trends_score = 0
+    # Shared DuckDB connection
+    con = get_cursor()
     
-    # News Pixels
-    news_path = DATA_DIR / "staging" / "news_pixels" / f"{today}.parquet"
-    if news_path.exists():
-        news_df = pd.read_parquet(news_path)
-        news_score = news_df['ai_pixel_percentage'].mean()
-    else:
-        news_score = 0
+    # Score every staging Parquet written today in a single query; sources
+    # that haven't landed yet score 0
+    sources = {}
+    for name, (pattern, query) in STAGING_SCORES.items():
+        path = DATA_DIR / "staging" / pattern.format(today=today)
+        if glob.glob(str(path)):
+            sources[name] = (query, str(path))
     
-    # Combine for attention index
-    attention_score = (trends_score + news_score) / 2
+    scores = dict.fromkeys(STAGING_SCORES, 0.0)
+    if sources:
+        try:
+            row = con.execute(
+                "SELECT " + ", ".join(f"({query}) AS {name}" for name, (query, _) in sources.items()),
+                [path for _, path in sources.values()]
+            ).fetchone()
+            values = dict(zip(sources, row))
+        except duckdb.Error as e:
+            # A file without the expected columns fails the whole statement;
+            # rescore source by source so only that file falls back to 0
+            logging.warning(f"Combined staging query failed, scoring sources separately: {e}")
+            values = {name: _score_source(con, name, query, path) for name, (query, path) in sources.items()}
+        scores.update({name: value for name, value in values.items() if value is not None})
     
-    # 3. Market Index (from polymarket)
-    market_path = DATA_DIR / "staging" / "polymarket" / f"{today}.parquet"
-    if market_path.exists():
-        market_df = pd.read_parquet(market_path)
-        market_score = market_df['price'].mean()
-    else:
-        market_score = 0
-    
-    # 4. Regulatory Index (from legislation)
-    regulatory_path = DATA_DIR / "staging" / "legislation" / f"{today}.parquet"
-    if regulatory_path.exists():
-        regulatory_df = pd.read_parquet(regulatory_path)
-        regulatory_score = regulatory_df['ai_bill_count'].mean()
-    else:
-        regulatory_score = 0
+    # Attention combines Google Trends and news pixels
+    capability_score = scores['capability']
+    attention_score = (scores['trends'] + scores['news']) / 2
+    market_score = scores['market']
+    regulatory_score = scores['regulatory']
     
     # Create the daily index DataFrame
     index_df = pd.DataFrame([{
@@ -110,36 +102,54 @@ def daily_index():
         'regulatory': regulatory_score
     }])
     
-    # Normalize the indices
-    # First, get historical data
-    historical_df = pd.DataFrame(con.execute("""
-        SELECT * FROM daily_index
-        ORDER BY date DESC
-        LIMIT 180
-    """).fetchall())
-    
-    if not historical_df.empty:
-        historical_df.columns = ['date', 'capability', 'attention', 'market', 'regulatory']
-        # Combine with today's data
-        combined_df = pd.concat([historical_df, index_df])
-        # Normalize
-        columns_to_normalize = ['capability', 'attention', 'market', 'regulatory']
-        normalized_df = normalize_data(combined_df, columns_to_normalize)
-        # Get just today's normalized data
-        index_df = normalized_df[normalized_df['date'] == today]
-    
-    # Insert into DuckDB
-    con.execute("""
-        INSERT INTO daily_index
-        VALUES (?, ?, ?, ?, ?)
-    """, [
-        today,
-        float(index_df['capability'].iloc[0]),
-        float(index_df['attention'].iloc[0]),
-        float(index_df['market'].iloc[0]),
-        float(index_df['regulatory'].iloc[0])
-    ])
-    
+    # Normalize today's values against the last 180 days plus today, in-engine;
+    # today's row from an earlier run is left out so a rerun rewrites the same value
+    con.register("today_raw", index_df)
+    con.begin()
+    try:
+        index_df = con.execute("""
+            WITH history AS (
+                SELECT capability, attention, market, regulatory FROM daily_index
+                WHERE date < CAST(? AS DATE)
+                ORDER BY date DESC
+                LIMIT 180
+            ),
+            combined AS (
+                SELECT * FROM history
+                UNION ALL
+                SELECT capability, attention, market, regulatory FROM today_raw
+            ),
+            stats AS (
+                SELECT
+                    (SELECT COUNT(*) FROM history) AS n,
+                    AVG(capability) AS mc, STDDEV_SAMP(capability) AS sc,
+                    AVG(attention) AS ma, STDDEV_SAMP(attention) AS sa,
+                    AVG(market) AS mm, STDDEV_SAMP(market) AS sm,
+                    AVG(regulatory) AS mr, STDDEV_SAMP(regulatory) AS sr
+                FROM combined
+            )
+            SELECT
+                CAST(t.date AS DATE) AS date,
+                CASE WHEN s.n = 0 THEN t.capability WHEN s.sc > 0 THEN (t.capability - s.mc) / s.sc ELSE 0 END AS capability,
+                CASE WHEN s.n = 0 THEN t.attention WHEN s.sa > 0 THEN (t.attention - s.ma) / s.sa ELSE 0 END AS attention,
+                CASE WHEN s.n = 0 THEN t.market WHEN s.sm > 0 THEN (t.market - s.mm) / s.sm ELSE 0 END AS market,
+                CASE WHEN s.n = 0 THEN t.regulatory WHEN s.sr > 0 THEN (t.regulatory - s.mr) / s.sr ELSE 0 END AS regulatory
+            FROM today_raw t, stats s
+        """, [today]).df()
+        
+        # Insert into DuckDB
+        con.register("today_df", index_df)
+        con.execute("INSERT OR REPLACE INTO daily_index SELECT * FROM today_df")
+        con.commit()
+    except Exception:
+        # Leave the shared connection usable for the next caller
+        con.rollback()
+        raise
+    con.unregister("today_raw")
+    con.unregister("today_df")
     con.close()
     
+    # Compact the WAL into the database file once per run
+    checkpoint()
+    
     return index_df
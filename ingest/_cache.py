@@ -0,0 +1,37 @@
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Any, Optional
+
+class FileCache:
+    """
+    Small on-disk cache of JSON values with a time-to-live, one file per key
+    """
+    def __init__(self, directory: Path, ttl: int):
+        self.directory = Path(directory)
+        self.ttl = ttl
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.md5(key.encode()).hexdigest()}.json"
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if missing or expired
+        """
+        try:
+            entry = json.loads(self._path(key).read_text())
+            ts, value = entry["ts"], entry["value"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        
+        if time.time() - ts >= self.ttl:
+            return None
+        return value
+    
+    def set(self, key: str, value: Any):
+        """
+        Store value under key, stamped with the current time
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path(key).write_text(json.dumps({"ts": time.time(), "value": value}))
@@ -60,6 +60,6 @@ def capability_asset():
     
     today = datetime.now().strftime("%Y-%m-%d")
     parquet_path = staging_dir / f"{today}.parquet"
-    df.to_parquet(parquet_path)
+    df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", compression_level=3)
     
     return df
@@ -19,19 +19,11 @@ def fetch_trends(keywords: list[str] = ["artificial intelligence", "AGI"], geo="
     if 'isPartial' in interest_over_time_df.columns:
         interest_over_time_df = interest_over_time_df.drop('isPartial', axis=1)
     
-    # Create output directory if it doesn't exist
-    raw_dir = DATA_DIR / "raw" / "google"
-    os.makedirs(raw_dir, exist_ok=True)
-    
-    # Save to CSV
-    today = datetime.now().strftime("%Y-%m-%d")
-    csv_path = raw_dir / f"{today}.csv"
-    interest_over_time_df.to_csv(csv_path)
-    
     # Save to Parquet for the pipeline
+    today = datetime.now().strftime("%Y-%m-%d")
     staging_dir = DATA_DIR / "staging" / "google_trends"
     os.makedirs(staging_dir, exist_ok=True)
     parquet_path = staging_dir / f"{today}.parquet"
-    interest_over_time_df.to_parquet(parquet_path)
+    interest_over_time_df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", compression_level=3)
     
     return interest_over_time_df
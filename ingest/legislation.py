@@ -2,13 +2,16 @@ import os
 import pandas as pd
 import re
 import httpx
-import time
+import asyncio
 from datetime import datetime, timedelta
 from dagster import asset
 
 from settings import DATA_DIR
 
-def fetch_new_bills() -> int:
+# Terms that mark a bill as AGI-related
+AI_TERMS = re.compile(r'\bAGI\b|\bfrontier AI\b|\bartificial general intelligence\b', re.IGNORECASE)
+
+async def fetch_new_bills() -> int:
     """
     Wrapper for Congress.gov API to count documents with AI-related terms
     """
@@ -33,41 +36,49 @@ def fetch_new_bills() -> int:
         # "api_key": os.getenv("CONGRESS_API_KEY")
     }
     
-    # Make request
-    response = httpx.get(base_url, params=params)
-    response.raise_for_status()
-    data = response.json()
-    
-    # Count bills with AGI or frontier AI mentions
-    count = 0
-    bills_with_terms = []
-    pattern = r'\bAGI\b|\bfrontier AI\b|\bartificial general intelligence\b'
+    # Respect rate limits by capping the number of open connections; requests
+    # beyond the cap wait for a free connection rather than timing out
+    limits = httpx.Limits(max_connections=5)
+    timeout = httpx.Timeout(30, pool=None)
     
-    # Check each bill's text
-    for bill in data.get('bills', []):
-        bill_id = bill.get('billNumber')
-        bill_type = bill.get('billType')
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        # Make request
+        response = await client.get(base_url, params=params)
+        response.raise_for_status()
+        data = response.json()
         
-        # Get bill text
-        text_url = f"{base_url}/{bill_type}/{bill_id}/text"
-        try:
-            text_response = httpx.get(text_url)
-            text_response.raise_for_status()
-            bill_text = text_response.text
+        async def fetch_one(bill: dict):
+            bill_id = bill.get('billNumber')
+            bill_type = bill.get('billType')
+            match = {
+                'bill_id': bill_id,
+                'bill_type': bill_type,
+                'date': bill.get('latestAction', {}).get('actionDate', '')
+            }
             
-            # Check for pattern
-            if re.search(pattern, bill_text, re.IGNORECASE):
-                count += 1
-                bills_with_terms.append({
-                    'bill_id': bill_id,
-                    'bill_type': bill_type,
-                    'date': bill.get('latestAction', {}).get('actionDate', '')
-                })
+            # A matching title settles it without downloading the text
+            if AI_TERMS.search(bill.get('title') or ''):
+                return match
             
-            # Respect rate limits
-            time.sleep(0.1)
-        except Exception as e:
-            print(f"Error getting text for bill {bill_type} {bill_id}: {e}")
+            # Get bill text
+            text_url = f"{base_url}/{bill_type}/{bill_id}/text"
+            try:
+                text_response = await client.get(text_url)
+                text_response.raise_for_status()
+                
+                # Check for pattern
+                if AI_TERMS.search(text_response.text):
+                    return match
+            except Exception as e:
+                print(f"Error getting text for bill {bill_type} {bill_id}: {e}")
+            return None
+        
+        # Check each bill's text concurrently
+        matches = await asyncio.gather(*[fetch_one(bill) for bill in data.get('bills', [])])
+    
+    # Count bills with AGI or frontier AI mentions
+    bills_with_terms = [match for match in matches if match is not None]
+    count = len(bills_with_terms)
     
     # Save the bills with terms
     if bills_with_terms:
@@ -80,7 +91,7 @@ def fetch_new_bills() -> int:
         
         today = datetime.now().strftime("%Y-%m-%d")
         parquet_path = staging_dir / f"{today}.parquet"
-        df.to_parquet(parquet_path)
+        df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", compression_level=3)
     
     return count
 
@@ -89,7 +100,7 @@ def legislation_asset():
     """
     Dagster asset to fetch Congress.gov data and write to staging Parquet
     """
-    count = fetch_new_bills()
+    count = asyncio.run(fetch_new_bills())
     
     # Create DataFrame with count
     df = pd.DataFrame([{
@@ -103,6 +114,6 @@ def legislation_asset():
     
     today = datetime.now().strftime("%Y-%m-%d")
     parquet_path = staging_dir / f"{today}.parquet"
-    df.to_parquet(parquet_path)
+    df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", compression_level=3)
     
     return df
@@ -1,21 +1,37 @@
 import os
 import pandas as pd
 import numpy as np
-import cv2
-import pytesseract
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from datetime import datetime
-from PIL import Image
+from selectolax.lexbor import LexborHTMLParser
 import io
+import re
+import logging
+import asyncio
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 from dagster import asset
 
-from settings import DATA_DIR
+from settings import DATA_DIR, NEWS_PIXELS_RENDER
+
+logger = logging.getLogger(__name__)
+
+# AI-related terms to look for in OCR'd words
+AI_KEYWORDS = re.compile(r"\b(ai|agi|artificial intelligence|machine learning)\b", re.IGNORECASE)
+
+# Relative rendered size of text inside these tags
+TAG_WEIGHTS = {"h1": 4.0, "h2": 3.0, "h3": 2.0, "h4": 1.5, "strong": 1.5, "b": 1.5}
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
 
 def take_screenshot(url: str) -> np.ndarray:
     """
     Use Selenium with headless Chrome to take a screenshot of a website
     """
+    # Rendering is opt-in (NEWS_PIXELS_RENDER), so Selenium and Pillow load only here
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from PIL import Image
+    
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
@@ -40,81 +56,149 @@ def analyze_image(image: np.ndarray) -> float:
     """
     Use OCR to detect text and calculate percentage of pixels with AI-related terms
     """
-    # Convert to grayscale for OCR
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
-    # Extract text using OCR
-    text = pytesseract.image_to_string(gray)
-    
-    # Count AI-related terms
-    ai_keywords = ["AI", "artificial intelligence", "AGI", "machine learning"]
+    import pytesseract
     
-    # Count occurrences
-    ai_mentions = sum(keyword.lower() in text.lower() for keyword in ai_keywords)
-    
-    # Map detected words to image regions
-    data = pytesseract.image_to_data(gray, output_type=pytesseract.Output.DICT)
+    # Detect words and their bounding boxes in a single OCR pass; Tesseract
+    # binarizes internally, so the RGB(A) screenshot goes in as-is
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
     
     # Calculate total pixels
     total_pixels = image.shape[0] * image.shape[1]
-    ai_pixels = 0
     
-    # For each detected word, check if it contains AI keywords
-    for i in range(len(data['text'])):
-        word = data['text'][i].lower()
-        if any(keyword.lower() in word for keyword in ai_keywords):
-            # Calculate area of this word's bounding box
-            x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
-            ai_pixels += w * h
+    # Sum the bounding-box area of every word matching an AI keyword
+    matches = [i for i, word in enumerate(data['text']) if AI_KEYWORDS.search(word)]
+    widths = np.asarray(data['width'])[matches]
+    heights = np.asarray(data['height'])[matches]
+    ai_pixels = int(np.sum(widths * heights))
     
     # Calculate percentage
     percentage = (ai_pixels / total_pixels) * 100 if total_pixels > 0 else 0
     
     return percentage
 
-@asset
-def news_pixels_asset():
+def analyze_html(html: str) -> float:
     """
-    Dagster asset to screenshot news sites and analyze AI mentions
+    Estimate the percentage of rendered text area taken up by AI-related terms,
+    approximating each text run's area as its length times a tag-based weight
     """
-    # News sites to analyze
-    news_sites = {
-        "nyt": "https://www.nytimes.com/",
-        "wsj": "https://www.wsj.com/",
-        "bbc": "https://www.bbc.com/"
-    }
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(["script", "style", "noscript", "template"])
+    root = tree.body or tree.root
+    if root is None:
+        return 0.0
+    
+    total_area = 0.0
+    ai_area = 0.0
+    for node in root.traverse(include_text=True):
+        if node.tag != "-text":
+            continue
+        text = node.text(deep=False).strip()
+        if not text:
+            continue
+        
+        # Headlines and emphasised text take up more of the page
+        weight = 1.0
+        parent = node.parent
+        while parent is not None and parent.tag != "body":
+            weight = max(weight, TAG_WEIGHTS.get(parent.tag, 1.0))
+            parent = parent.parent
+        
+        total_area += len(text) * weight
+        ai_area += sum(len(match.group()) for match in AI_KEYWORDS.finditer(text)) * weight
+    
+    # Calculate percentage
+    percentage = (ai_area / total_area) * 100 if total_area > 0 else 0
+    
+    return percentage
+
+async def fetch_html(client: httpx.AsyncClient, url: str) -> str:
+    """
+    Fetch the raw HTML of a website
+    """
+    response = await client.get(url)
+    response.raise_for_status()
+    return response.text
+
+async def scan_sites(news_sites: dict) -> dict:
+    """
+    Fetch every site concurrently and score its HTML for AI mentions
+    """
+    async with httpx.AsyncClient(follow_redirects=True, timeout=30, headers={"User-Agent": USER_AGENT}) as client:
+        pages = await asyncio.gather(
+            *[fetch_html(client, url) for url in news_sites.values()],
+            return_exceptions=True
+        )
     
     results = {}
+    for name, page in zip(news_sites, pages):
+        if isinstance(page, Exception):
+            logger.error("Error processing %s: %s", name, page)
+            results[name] = 0.0
+        else:
+            results[name] = analyze_html(page)
+    return results
+
+def screenshot_sites(news_sites: dict, today: str) -> dict:
+    """
+    Screenshot every site with headless Chrome and OCR it for AI mentions
+    """
+    from PIL import Image
+    
     screenshots_dir = DATA_DIR / "raw" / "screenshots"
     os.makedirs(screenshots_dir, exist_ok=True)
     
-    for name, url in news_sites.items():
+    def process_site(name: str, url: str) -> float:
         try:
             # Take screenshot
             image = take_screenshot(url)
             
             # Save screenshot
-            today = datetime.now().strftime("%Y-%m-%d")
             img_path = screenshots_dir / f"{name}_{today}.png"
-            cv2.imwrite(str(img_path), image)
+            Image.fromarray(image).save(img_path)
             
             # Analyze image
-            percentage = analyze_image(image)
-            results[name] = percentage
+            return analyze_image(image)
         except Exception as e:
-            print(f"Error processing {name}: {e}")
-            results[name] = 0.0
+            logger.error("Error processing %s: %s", name, e)
+            return 0.0
+    
+    # Each site gets its own headless Chrome, so render them concurrently
+    with ThreadPoolExecutor(max_workers=len(news_sites)) as executor:
+        return dict(zip(news_sites, executor.map(process_site, news_sites, news_sites.values())))
+
+@asset
+def news_pixels_asset():
+    """
+    Dagster asset to measure how much of each news homepage mentions AI
+    """
+    # News sites to analyze
+    news_sites = {
+        "nyt": "https://www.nytimes.com/",
+        "wsj": "https://www.wsj.com/",
+        "bbc": "https://www.bbc.com/"
+    }
+    
+    today = datetime.now().strftime("%Y-%m-%d")
+    
+    # Score the raw HTML unless pixel-accurate rendering is asked for
+    if NEWS_PIXELS_RENDER:
+        results = screenshot_sites(news_sites, today)
+    else:
+        results = asyncio.run(scan_sites(news_sites))
     
     # Create DataFrame
     df = pd.DataFrame(list(results.items()), columns=['site', 'ai_pixel_percentage'])
     df['date'] = datetime.now().strftime('%Y-%m-%d')
     
+    # Record how the percentage was measured: OCR'd screenshot pixels ("render")
+    # or weighted HTML text area ("html") are not on the same scale
+    df['mode'] = "render" if NEWS_PIXELS_RENDER else "html"
+    
     # Save to staging
     staging_dir = DATA_DIR / "staging" / "news_pixels"
     os.makedirs(staging_dir, exist_ok=True)
     
-    today = datetime.now().strftime("%Y-%m-%d")
     parquet_path = staging_dir / f"{today}.parquet"
-    df.to_parquet(parquet_path)
+    df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", compression_level=3)
     
     return df
@@ -1,108 +1,190 @@
-import os
 import pandas as pd
-from datetime import datetime
-import importlib.util
+import numpy as np
+from datetime import date
+import functools
 import logging
+import httpx
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow import fs
 from dagster import asset
 
-from settings import DATA_DIR, POLY_API
+from settings import DATA_DIR, POLY_API, POLY_CACHE_TTL
+from ingest._cache import FileCache
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CLOB_HOST = "https://clob.polymarket.com"
+GAMMA_HOST = "https://gamma-api.polymarket.com"
+
+# Example contracts related to AI, as (name, contract ID) pairs
+_CONTRACTS = (
+    ("ai-safety", "0x4c5435b2be38fae3dcecfe1e2bf04bbb2326b906"),
+    ("agi-progress", "0x7d8010eb8b5c23595542a5e51d05c5b87ba02fd3"),
+)
+
+# Prices barely move between reruns of the same day, so reuse recent responses
+@functools.lru_cache(maxsize=1)
+def _get_cache() -> FileCache:
+    """
+    Price cache under DATA_DIR, created on first use so DATA_DIR and the TTL
+    are read at call time rather than import time
+    """
+    return FileCache(DATA_DIR / ".cache" / "polymarket", POLY_CACHE_TTL)
+
+def _cache_key(contract_id: str, day: str) -> str:
+    return f"{contract_id}:{day}"
+
+@functools.lru_cache(maxsize=2)
+def _get_client(host: str = CLOB_HOST) -> httpx.Client:
+    """
+    Shared HTTP/2 client per API host (CLOB or Gamma), so every request to
+    that host reuses one pooled connection
+    """
+    return httpx.Client(
+        base_url=host,
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60)
+    )
+
 def fetch_contract(contract_id: str) -> float:
     """
-    Fetches the mid-price for a contract from Polymarket
+    Fetches the mid-price for a single contract from the CLOB API; kept as a
+    single-market helper, polymarket_asset prices in bulk through fetch_prices
     """
     if not POLY_API:
         logger.warning("No Polymarket API key found. Using example data.")
         return 0.5  # Return example data
-        
-    # Check if py-clob-client is available
-    clob_client_available = importlib.util.find_spec("py_clob_client") is not None
     
-    if clob_client_available:
-        try:
-            from py_clob_client.client import ClobClient
-            logger.info("Using py-clob-client for Polymarket API")
-            
-            # Try to use the Polymarket API key with ClobClient
-            # The host parameter is required
-            host = "https://clob.polymarket.com"
-            client = ClobClient(host=host, key=POLY_API, chain_id=137)
-            
-            try:
-                # Try fetching market data
-                market_data = client.get_market(market_id=contract_id)
-                
-                if market_data and 'midPrice' in market_data:
-                    return float(market_data['midPrice'])
-            except Exception as e:
-                logger.warning(f"Error fetching market data with ClobClient: {e}")
-                
-        except Exception as e:
-            logger.warning(f"Error initializing ClobClient: {e}. Falling back to polymarket-py.")
+    key = _cache_key(contract_id, date.today().isoformat())
+    cached = _get_cache().get(key)
+    if cached is not None:
+        return cached
+    
+    # Query the CLOB REST API over the shared connection pool
+    try:
+        response = _get_client().get(
+            f"/markets/{contract_id}",
+            headers={"Authorization": f"Bearer {POLY_API}"}
+        )
+        response.raise_for_status()
+        price = float(response.json()['midPrice'])
+    except (httpx.HTTPError, KeyError, TypeError, ValueError) as e:
+        logger.warning("Error fetching market data from the CLOB API: %s. Using example data.", e)
+        return 0.5  # Return example data
+    
+    _get_cache().set(key, price)
+    return price
+
+def _mid_price(market: dict) -> float:
+    """
+    Mid-price of a Gamma market record, falling back to the bid/ask midpoint
+    """
+    if market.get('midPrice') is not None:
+        return float(market['midPrice'])
+    return (float(market['bestBid']) + float(market['bestAsk'])) / 2
+
+def fetch_prices(contract_ids: list[str]) -> dict[str, float]:
+    """
+    Fetches mid-prices for many contracts in a single Gamma API request;
+    contracts that could not be priced are left out of the result
+    """
+    today = date.today().isoformat()
+    prices = {}
+    missing = []
+    for contract_id in contract_ids:
+        cached = _get_cache().get(_cache_key(contract_id, today))
+        if cached is not None:
+            prices[contract_id] = cached
+        else:
+            missing.append(contract_id)
+    
+    if not missing:
+        return prices
     
-    # Fallback to polymarket-py if available
-    polymarket_available = importlib.util.find_spec("polymarket") is not None
+    try:
+        response = _get_client(GAMMA_HOST).get(
+            "/markets",
+            params={"condition_ids": missing, "limit": len(missing)}
+        )
+        response.raise_for_status()
+        markets = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        logger.error("Error fetching markets from the Gamma API: %s", e)
+        return prices
     
-    if polymarket_available:
+    for market in markets:
+        contract_id = market.get('conditionId')
+        if contract_id not in missing:
+            continue
         try:
-            from polymarket.api import PolymarketAPI
-            logger.info("Using polymarket-py for Polymarket API")
-            api = PolymarketAPI(api_key=POLY_API)
-            
-            try:
-                market_data = api.get_market(market_id=contract_id)
-                
-                if market_data and 'midPrice' in market_data:
-                    return float(market_data['midPrice'])
-            except Exception as e:
-                logger.warning(f"Error fetching market data with PolymarketAPI: {e}")
-        except Exception as e:
-            logger.warning(f"Error initializing PolymarketAPI: {e}")
+            price = _mid_price(market)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("No price in Gamma market %s: %s", contract_id, e)
+            continue
+        prices[contract_id] = price
+        _get_cache().set(_cache_key(contract_id, today), price)
     
-    # If all methods fail, return sample data with logging
-    logger.warning("All Polymarket API methods failed. Using example data.")
-    return 0.5  # Return example data
+    return prices
 
-@asset
-def polymarket_asset():
+def _price_contracts() -> dict[str, float]:
     """
-    Dagster asset to fetch Polymarket contract prices and save to staging
+    Price every contract in _CONTRACTS by name, using placeholder data for
+    any the API didn't return
     """
-    # Example contracts related to AI
-    contracts = {
-        "ai-safety": "0x4c5435b2be38fae3dcecfe1e2bf04bbb2326b906", # Example contract ID
-        "agi-progress": "0x7d8010eb8b5c23595542a5e51d05c5b87ba02fd3",  # Example contract ID
-    }
+    if not POLY_API:
+        # Without a key every contract gets placeholder data, so skip the fetch
+        logger.warning("No Polymarket API key found. Using example data.")
+        return {name: 0.5 for name, _ in _CONTRACTS}
+    
+    prices = fetch_prices([contract_id for _, contract_id in _CONTRACTS])
     
     results = {}
-    for name, contract_id in contracts.items():
-        try:
-            price = fetch_contract(contract_id)
-            if price is not None:
-                results[name] = price
-        except Exception as e:
-            logger.error(f"Error fetching contract {name}: {e}")
+    for name, contract_id in _CONTRACTS:
+        if contract_id not in prices:
+            logger.error("No price returned for contract %s", name)
             # Use placeholder data
             results[name] = 0.5
-    
-    # Create DataFrame
-    df = pd.DataFrame(list(results.items()), columns=['contract', 'price'])
-    df['date'] = datetime.now().strftime('%Y-%m-%d')
+        else:
+            results[name] = prices[contract_id]
+    return results
+
+@asset
+def polymarket_asset():
+    """
+    Dagster asset to fetch Polymarket contract prices and save to staging
+    """
+    results = _price_contracts()
     
     # Ensure the DataFrame is not empty
-    if df.empty:
-        df = pd.DataFrame([{'contract': 'placeholder', 'price': 0.5, 'date': datetime.now().strftime('%Y-%m-%d')}])
+    if not results:
+        results = {'placeholder': 0.5}
+    
+    today = date.today()
+    
+    # Create DataFrame with Arrow-backed columns so the Parquet write needs no conversion
+    df = pd.DataFrame({
+        'contract': pd.array(list(results), dtype="string[pyarrow]"),
+        'price': pd.array(np.fromiter(results.values(), dtype=np.float32, count=len(results)), dtype="float32[pyarrow]"),
+        'date': pd.array([today] * len(results), dtype="date32[pyarrow]"),
+    })
     
-    # Save to staging
-    staging_dir = DATA_DIR / "staging" / "polymarket"
-    os.makedirs(staging_dir, exist_ok=True)
+    # Save to staging as a Hive-partitioned dataset (staging/polymarket/date=YYYY-MM-DD/);
+    # a rerun on the same day replaces that day's partition
+    partition_dir = DATA_DIR / "staging" / "polymarket" / f"date={today}"
+    partition_dir.mkdir(parents=True, exist_ok=True)
     
-    today = datetime.now().strftime("%Y-%m-%d")
-    parquet_path = staging_dir / f"{today}.parquet"
-    df.to_parquet(parquet_path)
+    # Serialise the partition in memory, then write it through one buffered
+    # stream so the pages and footer don't each cost a write on slow storage
+    table = pa.Table.from_pandas(df.drop(columns='date'), preserve_index=False)
+    buf = pa.BufferOutputStream()
+    pq.write_table(
+        table, buf,
+        compression="zstd", compression_level=3, use_dictionary=True,
+        write_statistics=True, row_group_size=100_000
+    )
+    with fs.LocalFileSystem().open_output_stream(str(partition_dir / "part-0.parquet"), buffer_size=4 << 20) as sink:
+        sink.write(buf.getvalue())
     
     return df
@@ -7,3 +7,5 @@ load_dotenv()
 DATA_DIR = Path(__file__).resolve().parents[0] / "data"
 SLACK_WEBHOOK = os.getenv("SLACK_WEBHOOK")
 POLY_API = os.getenv("POLY_API")
+NEWS_PIXELS_RENDER = os.getenv("NEWS_PIXELS_RENDER") == "1"
+POLY_CACHE_TTL = int(os.getenv("POLY_CACHE_TTL", "300"))
@@ -0,0 +1,37 @@
+import os
+import pytest
+
+# Markers for tests that are opt-in: they only run when selected with -m
+OPT_IN_MARKERS = ("network", "chrome")
+
+def pytest_collection_modifyitems(config, items):
+    """Skip live-API and browser tests unless the -m expression selects them"""
+    markexpr = config.getoption("markexpr")
+    for marker in OPT_IN_MARKERS:
+        if marker in markexpr:
+            continue
+        skip = pytest.mark.skip(reason=f"needs -m {marker}")
+        for item in items:
+            if marker in item.keywords:
+                item.add_marker(skip)
+
+@pytest.fixture(scope="session")
+def chrome_driver():
+    """One headless Chrome session shared by every Selenium test"""
+    # Selenium loads only for sessions that actually use the browser
+    webdriver = pytest.importorskip("selenium.webdriver")
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.chrome.service import Service
+    
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    service = Service(os.getenv("CHROME_DRIVER_PATH", "chromedriver"))
+    
+    try:
+        driver = webdriver.Chrome(service=service, options=options)
+    except WebDriverException as e:
+        pytest.skip(f"Chrome is not available: {e.msg}")
+    
+    yield driver
+    driver.quit()
@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+
+import detect.bocd as bocd
+
+
+@pytest.fixture
+def flat_series():
+    """100 days of low-noise values around zero"""
+    rng = np.random.default_rng(0)
+    return rng.normal(0.0, 0.1, 100)
+
+
+def test_step_change_detected(flat_series):
+    """A jump at the final timestep should start a new segment"""
+    stepped = flat_series.copy()
+    stepped[-1] += 5.0
+    
+    # Assertions
+    assert bocd._bocpd_run(stepped, 1.0 / bocd.HAZARD) > 0.9
+    assert bocd._bocpd_run(flat_series, 1.0 / bocd.HAZARD) < 0.01
+
+
+def test_detector_matches_run(flat_series):
+    """Streaming updates should agree with the batch kernel"""
+    detector = bocd.BOCPDDetector()
+    
+    # Assertions
+    assert detector.update(flat_series) == pytest.approx(bocd._bocpd_run(flat_series, 1.0 / bocd.HAZARD))
+
+
+def test_posterior_truncated():
+    """Once T exceeds R_MAX the posterior stays capped and normalised"""
+    x = np.random.default_rng(1).normal(0.0, 0.1, bocd.R_MAX + 100)
+    detector = bocd.BOCPDDetector()
+    detector.update(x)
+    
+    # Assertions
+    assert len(detector.posterior) <= bocd.R_MAX
+    assert detector.posterior.sum() == pytest.approx(1.0)
+    assert (detector.posterior >= 0).all()
+
+
+def test_debug_history_grows(flat_series):
+    """The debug history buffer should grow past max_t rather than overflow"""
+    detector = bocd.BOCPDDetector(max_t=10, debug=True)
+    detector.update(flat_series)
+    
+    # Assertions
+    assert detector._t == len(flat_series)
+    assert detector._hist.shape[0] >= len(flat_series)
+    assert detector._hist[:detector._t].sum(axis=1) == pytest.approx(np.ones(detector._t), rel=1e-5)
@@ -0,0 +1,47 @@
+import pytest
+
+from ingest._cache import FileCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable stand-in for time.time"""
+    now = [1000.0]
+    monkeypatch.setattr("ingest._cache.time.time", lambda: now[0])
+    return now
+
+
+def test_cache_hit_within_ttl(tmp_path, clock):
+    """A stored value is read back until the TTL elapses"""
+    cache = FileCache(tmp_path, ttl=300)
+    cache.set("contract:2024-01-01", 0.42)
+    
+    clock[0] += 299
+    
+    # Assertions
+    assert cache.get("contract:2024-01-01") == 0.42
+
+
+def test_cache_expires_at_ttl(tmp_path, clock):
+    """A value is stale once exactly ttl seconds have passed"""
+    cache = FileCache(tmp_path, ttl=300)
+    cache.set("contract:2024-01-01", 0.42)
+    
+    clock[0] += 300
+    
+    # Assertions
+    assert cache.get("contract:2024-01-01") is None
+
+
+def test_cache_missing_or_corrupt(tmp_path, clock):
+    """Missing and unreadable entries are treated as misses"""
+    cache = FileCache(tmp_path, ttl=300)
+    cache.set("corrupt", 0.42)
+    cache._path("corrupt").write_text("{not json")
+    cache.set("truncated", 0.42)
+    cache._path("truncated").write_text('{"ts": 1000.0}')
+    
+    # Assertions
+    assert cache.get("missing") is None
+    assert cache.get("corrupt") is None
+    assert cache.get("truncated") is None
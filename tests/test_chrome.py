@@ -1,10 +1,15 @@
-import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+import re
+import pytest
+import httpx
 
-service = Service(os.getenv("CHROME_DRIVER_PATH", "chromedriver"))
-driver  = webdriver.Chrome(service=service)
+@pytest.mark.network
+def test_example_title():
+    """The page is static HTML, so a plain GET is enough to read its title"""
+    html = httpx.get("https://example.com", timeout=5).text
+    assert re.search(r"<title>Example Domain</title>", html)
 
-driver.get("https://example.com")
-print(driver.title)  # should print “Example Domain”
-driver.quit()
\ No newline at end of file
+
+@pytest.mark.chrome
+def test_chromedriver_available(chrome_driver):
+    """Health check that chromedriver can start a session for the news screenshots"""
+    assert chrome_driver.session_id
@@ -0,0 +1,86 @@
+import pytest
+import pandas as pd
+
+import db
+import features.indices as indices
+
+
+@pytest.fixture(autouse=True)
+def data_dir(monkeypatch, tmp_path):
+    """Point features.indices and a fresh shared DuckDB connection at tmp_path"""
+    # Mock DATA_DIR and open a new shared connection on it
+    monkeypatch.setattr(db, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(indices, "DATA_DIR", tmp_path)
+    db.get_connection.cache_clear()
+    
+    yield tmp_path
+    
+    db.get_connection().close()
+    db.get_connection.cache_clear()
+
+
+def stage(folder: str, df: pd.DataFrame, name: str = None):
+    """Write df as today's staging Parquet for one source"""
+    today = indices.datetime.now().strftime("%Y-%m-%d")
+    path = indices.DATA_DIR / "staging" / folder / (name or f"{today}.parquet")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path)
+
+
+def stage_all():
+    """Stage a well-formed file for every source"""
+    today = indices.datetime.now().strftime("%Y-%m-%d")
+    stage("capabilities", pd.DataFrame({
+        "model": ["a", "b"], "MMMU": [1.0, 3.0], "GSM-Hard": [5.0, None], "date": [today] * 2
+    }))
+    stage("google_trends", pd.DataFrame(
+        {"AGI": [10, 20], "artificial intelligence": [30, 40]},
+        index=pd.DatetimeIndex(["2024-01-01", "2024-01-02"], name="date")
+    ))
+    stage("news_pixels", pd.DataFrame({"site": ["a"], "ai_pixel_percentage": [2.0], "date": [today]}))
+    stage(f"polymarket/date={today}", pd.DataFrame({"contract": ["a", "b"], "price": [0.4, 0.6]}), "part-0.parquet")
+    stage("legislation", pd.DataFrame({"date": [today], "ai_bill_count": [3]}))
+
+
+def test_daily_index():
+    """With no history, today's raw scores are stored as-is"""
+    stage_all()
+    
+    row = indices.daily_index().iloc[0]
+    
+    # Assertions
+    assert row['capability'] == pytest.approx(3.5)  # mean of the MMMU (2) and GSM-Hard (5) means
+    assert row['attention'] == pytest.approx((25 + 2) / 2)
+    assert row['market'] == pytest.approx(0.5)
+    assert row['regulatory'] == pytest.approx(3)
+
+
+def test_daily_index_degenerate_files():
+    """Files without the expected columns score 0 instead of failing the asset"""
+    stage_all()
+    today = indices.datetime.now().strftime("%Y-%m-%d")
+    stage("capabilities", pd.DataFrame({"date": [today]}))
+    stage("google_trends", pd.DataFrame(index=pd.DatetimeIndex([], name="date")))
+    
+    row = indices.daily_index().iloc[0]
+    
+    # Assertions
+    assert row['capability'] == 0
+    assert row['attention'] == pytest.approx((0 + 2) / 2)
+    assert row['market'] == pytest.approx(0.5)
+
+
+def test_daily_index_rerun():
+    """Rerunning on the same staging data rewrites the same normalised row"""
+    con = db.get_cursor()
+    for i, value in enumerate([0.0, 1.0, 2.0, 4.0]):
+        con.execute("INSERT INTO daily_index VALUES (?, ?, ?, ?, ?)", [f"2024-01-0{i + 1}", value, value, value, value])
+    con.close()
+    stage_all()
+    
+    first = indices.daily_index()
+    second = indices.daily_index()
+    
+    # Assertions
+    pd.testing.assert_frame_equal(first, second)
+    assert db.get_cursor().execute("SELECT COUNT(*) FROM daily_index").fetchone()[0] == 5
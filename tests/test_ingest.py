@@ -1,15 +1,11 @@
-import os
 import pytest
 import pandas as pd
-from unittest.mock import patch, MagicMock
+import numpy as np
+import httpx
+from unittest.mock import patch, MagicMock, AsyncMock
 import vcr
 
-from ingest.google_trends import fetch_trends
-from ingest.polymarket import fetch_contract
-from ingest.capability_scraper import fetch_capabilities
-from ingest.legislation import fetch_new_bills
-from ingest.news_pixels import analyze_image
-import numpy as np
+from ingest import google_trends, polymarket, capability_scraper, legislation, news_pixels
 
 # Configure VCR for recording HTTP interactions
 my_vcr = vcr.VCR(
@@ -27,21 +23,24 @@ def mock_settings(monkeypatch, tmp_path):
     data_dir.mkdir(exist_ok=True)
     
     # Mock DATA_DIR
-    monkeypatch.setattr("ingest.google_trends.DATA_DIR", data_dir)
-    monkeypatch.setattr("ingest.polymarket.DATA_DIR", data_dir)
-    monkeypatch.setattr("ingest.capability_scraper.DATA_DIR", data_dir)
-    monkeypatch.setattr("ingest.legislation.DATA_DIR", data_dir)
-    monkeypatch.setattr("ingest.news_pixels.DATA_DIR", data_dir)
+    for module in (google_trends, polymarket, capability_scraper, legislation, news_pixels):
+        monkeypatch.setattr(module, "DATA_DIR", data_dir)
     
     # Mock API keys
-    monkeypatch.setattr("ingest.polymarket.POLY_API", "fake_api_key")
+    monkeypatch.setattr(polymarket, "POLY_API", "fake_api_key")
+    
+    # Rebuild the price cache under the temp data directory
+    polymarket._get_cache.cache_clear()
+    yield
+    polymarket._get_cache.cache_clear()
 
 
+@pytest.mark.network
 @my_vcr.use_cassette('google_trends.yaml')
 def test_fetch_trends():
     """Test the Google Trends fetcher"""
     keywords = ["AI", "artificial intelligence"]
-    df = fetch_trends(keywords, geo="US")
+    df = google_trends.fetch_trends(keywords, geo="US")
     
     # Basic validation
     assert isinstance(df, pd.DataFrame)
@@ -52,27 +51,77 @@ def test_fetch_trends():
         assert any(keyword.lower() in col.lower() for col in df.columns)
 
 
-@patch('ingest.polymarket.PolymarketAPI')
-def test_fetch_contract(mock_polymarket):
+def test_fetch_contract():
     """Test the Polymarket contract fetcher"""
-    # Mock the API response
-    mock_api_instance = mock_polymarket.return_value
-    mock_api_instance.get_market.return_value = {'midPrice': '0.75'}
-    
-    # Call the function
-    price = fetch_contract("test_contract_id")
+    with patch.object(polymarket, '_get_client') as mock_get_client:
+        # Mock the API response
+        mock_client = mock_get_client.return_value
+        mock_client.get.return_value.json.return_value = {'midPrice': '0.75'}
+        
+        # Call the function
+        price = polymarket.fetch_contract("test_contract_id")
     
     # Assertions
-    assert mock_api_instance.get_market.called
-    assert mock_api_instance.get_market.call_args[1]['market_id'] == "test_contract_id"
+    assert mock_client.get.call_args[0][0] == "/markets/test_contract_id"
     assert price == 0.75
 
 
+def test_fetch_contract_error():
+    """Test that a failed Polymarket request falls back to example data"""
+    with patch.object(polymarket, '_get_client') as mock_get_client:
+        mock_get_client.return_value.get.side_effect = httpx.ConnectError("offline")
+        
+        # Call the function
+        price = polymarket.fetch_contract("test_contract_id")
+    
+    # Assertions
+    assert price == 0.5
+
+
+def test_fetch_prices():
+    """Test the batched Gamma price fetch, including the bid/ask fallback and cache"""
+    with patch.object(polymarket, '_get_client') as mock_get_client:
+        # Mock the API response
+        mock_client = mock_get_client.return_value
+        mock_client.get.return_value.json.return_value = [
+            {'conditionId': 'a', 'midPrice': '0.75'},
+            {'conditionId': 'b', 'bestBid': '0.4', 'bestAsk': '0.5'},
+        ]
+        
+        # Call the function twice; the second call is served from the cache
+        prices = polymarket.fetch_prices(['a', 'b'])
+        cached = polymarket.fetch_prices(['a', 'b'])
+    
+    # Assertions
+    mock_get_client.assert_called_with(polymarket.GAMMA_HOST)
+    assert mock_client.get.call_args[0][0] == "/markets"
+    assert prices == pytest.approx({'a': 0.75, 'b': 0.45})
+    assert cached == prices
+    assert mock_client.get.call_count == 1
+
+
+def test_price_contracts_missing_contract():
+    """Contracts missing from the Gamma response get polymarket_asset's placeholder price"""
+    with patch.object(polymarket, '_CONTRACTS', (('priced', 'a'), ('unpriced', 'b'))), \
+         patch.object(polymarket, '_get_client') as mock_get_client:
+        # Mock the API response
+        mock_get_client.return_value.get.return_value.json.return_value = [
+            {'conditionId': 'a', 'midPrice': '0.75'},
+        ]
+        
+        # Call the function
+        results = polymarket._price_contracts()
+    
+    # Assertions
+    assert results == pytest.approx({'priced': 0.75, 'unpriced': 0.5})
+
+
+@pytest.mark.network
 @my_vcr.use_cassette('capability_scraper.yaml')
 @pytest.mark.asyncio
 async def test_fetch_capabilities():
     """Test the capability scraper"""
-    capabilities = await fetch_capabilities()
+    capabilities = await capability_scraper.fetch_capabilities()
     
     # Basic validation
     assert isinstance(capabilities, dict)
@@ -90,9 +139,10 @@ async def test_fetch_capabilities():
 
 
 @my_vcr.use_cassette('legislation.yaml')
-def test_fetch_new_bills():
+@pytest.mark.asyncio
+async def test_fetch_new_bills():
     """Test the legislation fetcher"""
-    with patch('ingest.legislation.httpx.get') as mock_get:
+    with patch.object(legislation.httpx, 'AsyncClient') as mock_client_cls:
         # Mock the API response
         mock_response = MagicMock()
         mock_response.raise_for_status.return_value = None
@@ -102,44 +152,66 @@ def test_fetch_new_bills():
                     'billNumber': '123',
                     'billType': 'hr',
                     'latestAction': {'actionDate': '2023-05-01'}
+                },
+                {
+                    'billNumber': '456',
+                    'billType': 's',
+                    'title': 'Frontier AI Safety Act',
+                    'latestAction': {'actionDate': '2023-05-02'}
                 }
             ]
         }
         mock_response.text = "This bill concerns AGI regulation"
-        mock_get.return_value = mock_response
+        mock_client = mock_client_cls.return_value.__aenter__.return_value
+        mock_client.get = AsyncMock(return_value=mock_response)
         
         # Call the function
-        count = fetch_new_bills()
+        count = await legislation.fetch_new_bills()
         
         # Assertions
-        assert mock_get.called
-        assert count == 1
+        assert mock_client.get.call_count == 2  # bill list + text of the untitled bill
+        assert count == 2
 
 
 def test_analyze_image():
     """Test the image analysis function"""
+    # OCR is only needed for the optional screenshot path
+    pytesseract = pytest.importorskip("pytesseract")
+    
     # Create a simple test image with some text
     # This would be a 100x100 white image
     image = np.ones((100, 100, 3), dtype=np.uint8) * 255
     
-    with patch('ingest.news_pixels.pytesseract.image_to_string') as mock_ocr_string:
-        with patch('ingest.news_pixels.pytesseract.image_to_data') as mock_ocr_data:
-            # Mock OCR text result
-            mock_ocr_string.return_value = "This is a test with AI mentioned"
-            
-            # Mock OCR data result
-            mock_ocr_data.return_value = {
-                'text': ['This', 'is', 'a', 'test', 'with', 'AI', 'mentioned'],
-                'left': [10, 30, 50, 70, 10, 30, 50],
-                'top': [10, 10, 10, 10, 30, 30, 30],
-                'width': [20, 20, 20, 20, 20, 20, 20],
-                'height': [20, 20, 20, 20, 20, 20, 20]
-            }
-            
-            # Call the function
-            percentage = analyze_image(image)
-            
-            # Assertions
-            assert mock_ocr_string.called
-            assert mock_ocr_data.called
-            assert percentage >= 0
+    with patch.object(pytesseract, 'image_to_data') as mock_ocr_data:
+        # Mock OCR data result
+        mock_ocr_data.return_value = {
+            'text': ['This', 'is', 'a', 'test', 'with', 'AI', 'mentioned'],
+            'left': [10, 30, 50, 70, 10, 30, 50],
+            'top': [10, 10, 10, 10, 30, 30, 30],
+            'width': [20, 20, 20, 20, 20, 20, 20],
+            'height': [20, 20, 20, 20, 20, 20, 20]
+        }
+        
+        # Call the function
+        percentage = news_pixels.analyze_image(image)
+        
+        # Assertions
+        assert mock_ocr_data.called
+        assert percentage == 4.0  # one 20x20 "AI" box in a 100x100 image
+
+
+def test_analyze_html():
+    """Test the HTML analysis function"""
+    html = """
+    <html><body>
+        <h1>AI takes over</h1>
+        <p>Nothing to see here, she said</p>
+        <script>var ai = 1;</script>
+    </body></html>
+    """
+    
+    # Call the function
+    percentage = news_pixels.analyze_html(html)
+    
+    # "AI" is 2 chars of a 4x-weighted 13-char headline next to 29 chars of body text
+    assert percentage == pytest.approx(2 * 4 / (13 * 4 + 29) * 100)
@@ -0,0 +1,35 @@
+import pytest
+
+from settings import POLY_API
+
+# Example contract ID
+CONTRACT_ID = "0x4c5435b2be38fae3dcecfe1e2bf04bbb2326b906"
+
+pytestmark = pytest.mark.network
+
+
+@pytest.fixture(scope="module")
+def polymarket():
+    """ingest.polymarket, whose pooled clients are shared by every test here"""
+    if not POLY_API:
+        pytest.skip("no POLY_API")
+    import ingest.polymarket as polymarket
+    return polymarket
+
+
+@pytest.mark.parametrize("backend", ["clob", "gamma"])
+def test_fetch(backend, polymarket):
+    """Fetch live market data for the example contract from each endpoint"""
+    if backend == "clob":
+        response = polymarket._get_client().get(
+            f"/markets/{CONTRACT_ID}",
+            headers={"Authorization": f"Bearer {POLY_API}"}
+        )
+    else:
+        response = polymarket._get_client(polymarket.GAMMA_HOST).get(
+            "/markets",
+            params={"condition_ids": [CONTRACT_ID]}
+        )
+    response.raise_for_status()
+    
+    assert response.json()